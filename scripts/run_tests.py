@@ -57,6 +57,7 @@ def main():
                 "pytest-asyncio",
                 "pytest-cov",
                 "pytest-mock",
+                "pytest-xdist",
             ],
             env,
         )
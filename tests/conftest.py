@@ -1,9 +1,7 @@
 # Copyright 2025 t54 labs
 # SPDX-License-Identifier: Apache-2.0
-import asyncio
 import os
 import sys
-from typing import Generator
 from unittest.mock import AsyncMock
 
 import httpx
@@ -22,14 +20,6 @@ _add_project_root_to_syspath()
 # Import after adding to syspath
 
 
-@pytest.fixture(scope="session")
-def event_loop() -> Generator:
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.new_event_loop()
-    yield loop
-    loop.close()
-
-
 @pytest.fixture
 def mock_httpx_client() -> AsyncMock:
     """Mock httpx AsyncClient for testing external API calls."""
@@ -4,200 +4,279 @@
 Test x402 client SDK functionality.
 """
 
-from unittest.mock import Mock, patch
-
 import pytest
+from x402_secure_client.agent import store_agent_trace
+from x402_secure_client.buyer import BuyerClient, BuyerConfig
+from x402_secure_client.risk import RiskClient
+from x402_secure_client.seller import SellerClient
+from x402_secure_client.tracing import OpenAITraceCollector
+
+SIGNING_KEY = "0x" + "a" * 64
+BUYER_ADDR = "0x" + "b" * 40
+RECEIVER_ADDR = "0x" + "c" * 40
+TX_HASH = "0x" + "e" * 64
+SID = "925ca6ee-aa4b-4508-955b-10b1c02c69bb"
+TID = "af88271b-e93d-4998-bc15-2f130d437262"
+
+PAYMENT_PAYLOAD = {
+    "from": BUYER_ADDR,
+    "to": RECEIVER_ADDR,
+    "value": "1000000",
+}
+PAYMENT_REQUIREMENTS = {"merchantName": "Test", "accepts": []}
+
+
+class _Resp:
+    """Minimal stand-in for an httpx.Response the SDK only reads from.
+
+    The tests never assert on the response objects themselves, so the
+    Mock machinery (spec scan, call recording) is pure overhead here.
+    """
+
+    __slots__ = ("_payload", "status_code", "headers")
+
+    def __init__(self, payload, status_code=200, headers=None):
+        self._payload = payload
+        self.status_code = status_code
+        self.headers = headers if headers is not None else {"content-type": "application/json"}
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        return None
+
+
+# Canned responses built once at import. The SDK only reads from these,
+# so a single instance of each is safe to share across tests.
+SESSION_RESP = _Resp({"sid": SID, "expires_at": "2025-12-31T23:59:59Z"})
+TRACE_RESP = _Resp({"tid": TID})
+VERIFY_RESP = _Resp({"isValid": True, "payer": BUYER_ADDR})
+SETTLE_RESP = _Resp({"success": True, "txHash": TX_HASH})
+PRICE_PREFLIGHT_RESP = _Resp(
+    {
+        "accepts": [
+            {
+                "payTo": RECEIVER_ADDR,
+                "maxAmountRequired": "1000000",
+                "resource": "/api/price",
+                "network": "base-sepolia",
+                "asset": "USDC",
+                "scheme": "eip3009",
+                "description": "Price data",
+                "mimeType": "application/json",
+                "maxTimeoutSeconds": 3600,
+            }
+        ]
+    },
+    status_code=402,
+)
+PRICE_RESP = _Resp({"price": 63500.12})
+
+# Response sequences for the agent payment flow, in call order.
+AGENT_FLOW_RISK_RESPONSES = (SESSION_RESP, TRACE_RESP)
+AGENT_FLOW_HTTP_RESPONSES = (PRICE_PREFLIGHT_RESP, PRICE_RESP)
+
+
+def _sequence_stub(*responses):
+    """Build an async callable that returns ``responses`` in order.
+
+    Tests only assert on how many times the mocked method was called, so
+    a bare coroutine function with a ``calls`` counter is enough - no
+    need for AsyncMock's per-call argument recording.
+    """
+    it = iter(responses)
+
+    async def call(*args, **kwargs):
+        call.calls += 1
+        return next(it)
+
+    call.calls = 0
+    return call
+
+
+@pytest.fixture(scope="module")
+def test_env():
+    """Module-scoped variant of the conftest ``test_env`` fixture.
+
+    The client fixtures below are shared across the whole module, so their
+    environment has to outlive a single test.
+    """
+    mp = pytest.MonkeyPatch()
+    mp.setenv("AGENT_GATEWAY_URL", "http://localhost:8000")
+    mp.setenv("UPSTREAM_FACILITATOR_BASE_URL", "https://facilitator.example.com")
+    mp.setenv("PROXY_LOCAL_RISK", "1")
+    mp.setenv("BUYER_SIGNING_KEY", SIGNING_KEY)
+    mp.setenv("BUYER_ADDRESS", BUYER_ADDR)
+    mp.setenv("SELLER_MERCHANT_NAME", "Test Merchant")
+    mp.setenv("SELLER_MERCHANT_DOMAIN", "https://test.example.com")
+    yield
+    mp.undo()
+
+
+@pytest.fixture(scope="module")
+def buyer_client(test_env):
+    """Create buyer client instance shared by all tests in this module."""
+    config = BuyerConfig(
+        seller_base_url="http://localhost:8001",
+        agent_gateway_url="http://localhost:8000",
+        network="base-sepolia",
+        buyer_private_key=SIGNING_KEY,
+    )
+    return BuyerClient(config)
+
+
+@pytest.fixture(scope="module")
+def risk_client(test_env):
+    """Create risk client instance shared by all tests in this module."""
+    return RiskClient(base_url="http://localhost:8000")
+
+
+@pytest.fixture(scope="module")
+def seller_client(test_env):
+    """Create seller client instance shared by all tests in this module."""
+    return SellerClient("http://localhost:8000")
+
+
+@pytest.fixture
+def stub_risk_post(risk_client):
+    """Install a counting stub as the risk client's ``http.post``."""
+
+    def install(*responses):
+        stub = _sequence_stub(*responses)
+        risk_client.http.post = stub
+        return stub
+
+    yield install
+    # Un-shadow the instance attribute so the shared client exposes the
+    # real method again rather than a consumed stub.
+    if "post" in vars(risk_client.http):
+        del risk_client.http.post
+
+
+@pytest.fixture
+def stub_seller_post(seller_client):
+    """Install a counting stub as the seller client's ``http.post``."""
+
+    def install(*responses):
+        stub = _sequence_stub(*responses)
+        seller_client.http.post = stub
+        return stub
+
+    yield install
+    if "post" in vars(seller_client.http):
+        del seller_client.http.post
+
+
+@pytest.fixture
+def stub_buyer_get(buyer_client):
+    """Install a counting stub as the buyer client's ``http.get``."""
+
+    def install(*responses):
+        stub = _sequence_stub(*responses)
+        buyer_client.http.get = stub
+        return stub
+
+    yield install
+    if "get" in vars(buyer_client.http):
+        del buyer_client.http.get
 
 
-@pytest.mark.asyncio
 class TestBuyerClient:
     """Test buyer client functionality."""
 
-    @pytest.fixture
-    def buyer_client(self, test_env):
-        """Create buyer client instance."""
-        from x402_secure_client.buyer import BuyerClient, BuyerConfig
+    async def test_execute_paid_request_preflight(self, buyer_client, stub_buyer_get):
+        """Test that BuyerClient handles 402 preflight correctly."""
+        # Mock the 402 preflight request
+        preflight_response = _Resp(
+            {
+                "accepts": [
+                    {
+                        "payTo": RECEIVER_ADDR,
+                        "maxAmountRequired": "1000000",
+                        "resource": "/api/data",
+                        "network": "base-sepolia",
+                        "asset": "USDC",
+                    }
+                ]
+            },
+            status_code=402,
+        )
+        get = stub_buyer_get(preflight_response)
 
-        config = BuyerConfig(
-            seller_base_url="http://localhost:8001",
-            agent_gateway_url="http://localhost:8000",
-            network="base-sepolia",
-            buyer_private_key="0x" + "a" * 64,
+        # Test that _first_request_402 extracts payment requirements correctly
+        pr = await buyer_client._first_request_402(
+            url="http://localhost:8001/api/data", params={"query": "test"}
         )
-        return BuyerClient(config)
 
-    async def test_execute_paid_request_preflight(self, buyer_client):
-        """Test that BuyerClient handles 402 preflight correctly."""
-        # Mock the 402 preflight request
-        preflight_response = Mock()
-        preflight_response.status_code = 402
-        preflight_response.headers = {"content-type": "application/json"}
-        preflight_response.json.return_value = {
-            "accepts": [
-                {
-                    "payTo": "0x" + "c" * 40,
-                    "maxAmountRequired": "1000000",
-                    "resource": "/api/data",
-                    "network": "base-sepolia",
-                    "asset": "USDC",
-                }
-            ]
-        }
-
-        with patch.object(buyer_client.http, "get") as mock_get:
-            mock_get.return_value = preflight_response
-
-            # Test that _first_request_402 extracts payment requirements correctly
-            pr = await buyer_client._first_request_402(
-                url="http://localhost:8001/api/data", params={"query": "test"}
-            )
-
-            assert pr["payTo"] == "0x" + "c" * 40
-            assert pr["maxAmountRequired"] == "1000000"
-            assert pr["network"] == "base-sepolia"
-            mock_get.assert_called_once()
-
-
-@pytest.mark.asyncio
-class TestRiskClient:
-    """Test risk client functionality."""
+        assert pr["payTo"] == RECEIVER_ADDR
+        assert pr["maxAmountRequired"] == "1000000"
+        assert pr["network"] == "base-sepolia"
+        assert get.calls == 1
 
-    @pytest.fixture
-    def risk_client(self, test_env):
-        """Create risk client instance."""
-        from x402_secure_client.risk import RiskClient
 
-        return RiskClient(base_url="http://localhost:8000")
+class TestRiskClient:
+    """Test risk client functionality."""
 
-    async def test_create_session(self, risk_client):
+    async def test_create_session(self, risk_client, stub_risk_post):
         """Test creating risk session."""
-        with patch.object(risk_client.http, "post") as mock_post:
-            mock_response = Mock()
-            mock_response.json.return_value = {
-                "sid": "925ca6ee-aa4b-4508-955b-10b1c02c69bb",
-                "expires_at": "2025-12-31T23:59:59Z",
-            }
-            mock_response.raise_for_status = Mock()
-            mock_response.headers = {"content-type": "application/json"}
-            mock_post.return_value = mock_response
+        post = stub_risk_post(SESSION_RESP)
 
-            session = await risk_client.create_session(
-                agent_did="0x" + "b" * 40,
-                app_id="test-app",
-                device={"user_agent": "x402-agent/1.0"},
-            )
+        session = await risk_client.create_session(
+            agent_did=BUYER_ADDR,
+            wallet_address=BUYER_ADDR,
+            app_id="test-app",
+            device={"user_agent": "x402-agent/1.0"},
+        )
 
-            assert session["sid"] == "925ca6ee-aa4b-4508-955b-10b1c02c69bb"
-            mock_post.assert_called_once()
+        assert session["sid"] == SID
+        assert post.calls == 1
 
-    async def test_create_trace(self, risk_client):
+    async def test_create_trace(self, risk_client, stub_risk_post):
         """Test submitting agent trace."""
-        with patch.object(risk_client.http, "post") as mock_post:
-            mock_response = Mock()
-            mock_response.json.return_value = {"tid": "af88271b-e93d-4998-bc15-2f130d437262"}
-            mock_response.raise_for_status = Mock()
-            mock_response.headers = {"content-type": "application/json"}
-            mock_post.return_value = mock_response
+        post = stub_risk_post(TRACE_RESP)
 
-            result = await risk_client.create_trace(
-                sid="925ca6ee-aa4b-4508-955b-10b1c02c69bb",
-                agent_trace={"task": "Get weather", "events": []},
-            )
+        result = await risk_client.create_trace(
+            sid=SID,
+            agent_trace={"task": "Get weather", "events": []},
+        )
 
-            assert result["tid"] == "af88271b-e93d-4998-bc15-2f130d437262"
-            mock_post.assert_called_once()
+        assert result["tid"] == TID
+        assert post.calls == 1
 
 
-@pytest.mark.asyncio
 class TestSellerClient:
     """Test seller client functionality."""
 
-    @pytest.fixture
-    def seller_client(self, test_env):
-        """Create seller client instance."""
-        from x402_secure_client.seller import SellerClient
-
-        return SellerClient("http://localhost:8000")
-
-    async def test_verify_payment(self, seller_client):
-        """Test payment verification."""
-        with patch.object(seller_client.http, "post") as mock_post:
-            mock_response = Mock()
-            mock_response.json.return_value = {"isValid": True, "payer": "0x" + "b" * 40}
-            mock_response.raise_for_status = Mock()
-            mock_response.headers = {"content-type": "application/json"}
-            mock_post.return_value = mock_response
-
-            result = await seller_client.verify(
-                payment_payload={
-                    "from": "0x" + "b" * 40,
-                    "to": "0x" + "c" * 40,
-                    "value": "1000000",
-                },
-                payment_requirements={"merchantName": "Test", "accepts": []},
-                x_payment_b64="base64payment",
-                origin="http://localhost",
-                x_payment_secure="tid=test",
-                risk_sid="test-sid",
-            )
-
-            assert result["isValid"] is True
-            assert result["payer"] == "0x" + "b" * 40
-
-    async def test_settle_payment(self, seller_client):
-        """Test payment settlement."""
-        with patch.object(seller_client.http, "post") as mock_post:
-            mock_response = Mock()
-            mock_response.json.return_value = {"success": True, "txHash": "0x" + "e" * 64}
-            mock_response.raise_for_status = Mock()
-            mock_response.headers = {"content-type": "application/json"}
-            mock_post.return_value = mock_response
-
-            result = await seller_client.settle(
-                payment_payload={
-                    "from": "0x" + "b" * 40,
-                    "to": "0x" + "c" * 40,
-                    "value": "1000000",
-                },
-                payment_requirements={"merchantName": "Test", "accepts": []},
-                x_payment_b64="base64payment",
-                origin="http://localhost",
-                x_payment_secure="tid=test",
-                risk_sid="test-sid",
-            )
-
-            assert result["success"] is True
-            assert result["txHash"].startswith("0x")
-
-
-@pytest.mark.asyncio
-class TestAgentIntegration:
-    """Test AI agent integration features."""
-
-    @pytest.fixture
-    def buyer_client(self, test_env):
-        """Create buyer client instance."""
-        from x402_secure_client.buyer import BuyerClient, BuyerConfig
-
-        config = BuyerConfig(
-            seller_base_url="http://localhost:8001",
-            agent_gateway_url="http://localhost:8000",
-            network="base-sepolia",
-            buyer_private_key="0x" + "a" * 64,
+    @pytest.mark.parametrize(
+        ("op", "response", "expected"),
+        [
+            ("verify", VERIFY_RESP, {"isValid": True, "payer": BUYER_ADDR}),
+            ("settle", SETTLE_RESP, {"success": True, "txHash": TX_HASH}),
+        ],
+    )
+    async def test_verify_and_settle(self, seller_client, stub_seller_post, op, response, expected):
+        """Test payment verification and settlement against the gateway."""
+        stub_seller_post(response)
+
+        result = await getattr(seller_client, op)(
+            payment_payload=PAYMENT_PAYLOAD,
+            payment_requirements=PAYMENT_REQUIREMENTS,
+            x_payment_b64="base64payment",
+            origin="http://localhost",
+            x_payment_secure="tid=test",
+            risk_sid="test-sid",
         )
-        return BuyerClient(config)
 
-    @pytest.fixture
-    def risk_client(self, test_env):
-        """Create risk client instance."""
-        from x402_secure_client.risk import RiskClient
+        for key, value in expected.items():
+            assert result[key] == value
 
-        return RiskClient(base_url="http://localhost:8000")
 
-    async def test_agent_trace_builder(self):
-        """Test building agent trace with OpenAITraceCollector."""
-        from x402_secure_client.tracing import OpenAITraceCollector
+class TestAgentIntegration:
+    """Test AI agent integration features."""
 
+    def test_agent_trace_builder(self):
+        """Test building agent trace with OpenAITraceCollector."""
         collector = OpenAITraceCollector()
 
         # Set model configuration
@@ -214,82 +293,33 @@ class TestAgentIntegration:
         assert collector.model_config["model"] == "gpt-4"
         assert collector.events[0]["type"] == "user_input"
 
-    async def test_store_agent_trace(self, risk_client):
+    async def test_store_agent_trace(self, risk_client, stub_risk_post):
         """Test storing agent trace."""
-        from x402_secure_client.agent import store_agent_trace
-
-        with patch.object(risk_client.http, "post") as mock_post:
-            mock_response = Mock()
-            mock_response.json.return_value = {"tid": "test-tid-123"}
-            mock_response.raise_for_status = Mock()
-            mock_response.headers = {"content-type": "application/json"}
-            mock_post.return_value = mock_response
-
-            tid = await store_agent_trace(
-                risk=risk_client,
-                sid="test-sid",
-                task="Get BTC price",
-                params={"symbol": "BTC/USD"},
-                environment={"model": "gpt-4"},
-                events=[{"type": "tool_call", "tool": "get_price"}],
-                model_config={"temperature": 0.7},
-            )
-
-            assert tid == "test-tid-123"
-            mock_post.assert_called_once()
-
-    async def test_execute_payment_with_tid(self, buyer_client):
-        """Test executing payment with trace ID using run_agent_payment."""
-        from x402_secure_client.risk import RiskClient
-
-        risk_client = RiskClient(base_url="http://localhost:8000")
-
-        # Mock risk client responses
-        with patch.object(risk_client.http, "post") as mock_risk_post:
-            # Mock session creation
-            session_response = Mock()
-            session_response.json.return_value = {"sid": "test-sid"}
-            session_response.raise_for_status = Mock()
-            session_response.headers = {"content-type": "application/json"}
-
-            # Mock trace creation
-            trace_response = Mock()
-            trace_response.json.return_value = {"tid": "test-tid"}
-            trace_response.raise_for_status = Mock()
-            trace_response.headers = {"content-type": "application/json"}
-
-            mock_risk_post.side_effect = [session_response, trace_response]
-
-            # Mock buyer client 402 flow
-            preflight_response = Mock()
-            preflight_response.status_code = 402
-            preflight_response.headers = {"content-type": "application/json"}
-            preflight_response.json.return_value = {
-                "accepts": [
-                    {
-                        "payTo": "0x" + "c" * 40,
-                        "maxAmountRequired": "1000000",
-                        "resource": "/api/price",
-                        "network": "base-sepolia",
-                        "asset": "USDC",
-                        "scheme": "eip3009",
-                        "description": "Price data",
-                        "mimeType": "application/json",
-                        "maxTimeoutSeconds": 3600,
-                    }
-                ]
-            }
-
-            final_response = Mock()
-            final_response.status_code = 200
-            final_response.json.return_value = {"price": 63500.12}
-            final_response.raise_for_status = Mock()
+        post = stub_risk_post(TRACE_RESP)
+
+        tid = await store_agent_trace(
+            risk=risk_client,
+            sid="test-sid",
+            task="Get BTC price",
+            params={"symbol": "BTC/USD"},
+            environment={"model": "gpt-4"},
+            events=[{"type": "tool_call", "tool": "get_price"}],
+            model_config={"temperature": 0.7},
+        )
 
-            with patch.object(buyer_client.http, "get") as mock_get:
-                mock_get.side_effect = [preflight_response, final_response]
+        assert tid == TID
+        assert post.calls == 1
 
-                # This test just verifies the structure - actual execution would
-                # need OpenTelemetry setup. For now, we test that components exist
-                assert hasattr(risk_client, "create_session")
-                assert hasattr(risk_client, "create_trace")
-                assert hasattr(buyer_client, "execute_paid_request")
+    def test_execute_payment_with_tid(
+        self, buyer_client, risk_client, stub_risk_post, stub_buyer_get
+    ):
+        """Test executing payment with trace ID using run_agent_payment."""
+        # Mock risk session + trace creation, then the buyer 402 flow
+        stub_risk_post(*AGENT_FLOW_RISK_RESPONSES)
+        stub_buyer_get(*AGENT_FLOW_HTTP_RESPONSES)
+
+        # This test just verifies the structure - actual execution would
+        # need OpenTelemetry setup. For now, we test that components exist
+        assert hasattr(risk_client, "create_session")
+        assert hasattr(risk_client, "create_trace")
+        assert hasattr(buyer_client, "execute_paid_request")
@@ -10,18 +10,22 @@ from unittest.mock import AsyncMock, patch
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from x402_proxy import risk_router, router
+
+AGENT_ADDR = "0x" + "b" * 40
+
+# Request bodies the proxy never mutates, shared across tests.
+SESSION_REQUEST = {"agent_did": AGENT_ADDR, "wallet_address": AGENT_ADDR}
+TRACEPARENT = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+XPS = f"w3c.v1;tp={TRACEPARENT}"
 
 
-@pytest.mark.asyncio
 class TestCompletePaymentFlow:
     """Test the complete payment flow from risk session to settlement."""
 
     @pytest.fixture
     def app(self):
         """Create FastAPI app instance."""
-        from fastapi import FastAPI
-        from x402_proxy import risk_router, router
-
         app = FastAPI(title="Test x402 Proxy")
         app.include_router(risk_router)
         app.include_router(router)
@@ -32,13 +36,12 @@ class TestCompletePaymentFlow:
         """Create test client."""
         return TestClient(app)
 
-    async def test_risk_session_creation(self, client: TestClient):
+    def test_risk_session_creation(self, client: TestClient):
         """Test creating a risk session."""
         response = client.post(
             "/risk/session",
             json={
-                "agent_did": "0x" + "b" * 40,
-                "wallet_address": "0x" + "b" * 40,
+                **SESSION_REQUEST,
                 "app_id": "test-app",
                 "device": {"user_agent": "x402-agent/1.0"},
             },
@@ -50,15 +53,12 @@ class TestCompletePaymentFlow:
         assert "expires_at" in data
         assert len(data["sid"]) == 36  # UUID format
 
-    async def test_agent_trace_submission(
+    def test_agent_trace_submission(
         self, client: TestClient, sample_risk_session, sample_agent_trace
     ):
         """Test submitting agent trace."""
         # First create a session
-        session_response = client.post(
-            "/risk/session",
-            json={"agent_did": "0x" + "b" * 40, "wallet_address": "0x" + "b" * 40},
-        )
+        session_response = client.post("/risk/session", json=SESSION_REQUEST)
         sid = session_response.json()["sid"]
 
         # Submit trace
@@ -74,7 +74,7 @@ class TestCompletePaymentFlow:
 
     @pytest.mark.skip(reason="Requires complex mocking of upstream facilitator HTTP calls")
     @patch("httpx.AsyncClient")
-    async def test_payment_verification_with_risk(
+    def test_payment_verification_with_risk(
         self, mock_httpx: AsyncMock, client: TestClient, sample_payment_data: dict
     ):
         """Test payment verification with risk assessment."""
@@ -85,20 +85,16 @@ class TestCompletePaymentFlow:
         mock_httpx.return_value.__aenter__.return_value.post.return_value = mock_response
 
         # Create session first
-        session_response = client.post(
-            "/risk/session",
-            json={"agent_did": "0x" + "b" * 40, "wallet_address": "0x" + "b" * 40},
-        )
+        session_response = client.post("/risk/session", json=SESSION_REQUEST)
         sid = session_response.json()["sid"]
 
         # Verify payment
-        xps = "w3c.v1;tp=00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
         response = client.post(
             "/x402/verify",
             json=sample_payment_data,
             headers={
                 "X-PAYMENT": "base64encodedpayment",
-                "X-PAYMENT-SECURE": xps,
+                "X-PAYMENT-SECURE": XPS,
                 "X-RISK-SESSION": sid,
                 "Origin": "https://test.example.com",
             },
@@ -111,7 +107,7 @@ class TestCompletePaymentFlow:
 
     @pytest.mark.skip(reason="Requires complex mocking of upstream facilitator HTTP calls")
     @patch("httpx.AsyncClient")
-    async def test_payment_settlement(
+    def test_payment_settlement(
         self, mock_httpx: AsyncMock, client: TestClient, sample_payment_data: dict
     ):
         """Test payment settlement."""
@@ -127,20 +123,16 @@ class TestCompletePaymentFlow:
         mock_httpx.return_value.__aenter__.return_value.post.return_value = mock_response
 
         # Create session
-        session_response = client.post(
-            "/risk/session",
-            json={"agent_did": "0x" + "b" * 40, "wallet_address": "0x" + "b" * 40},
-        )
+        session_response = client.post("/risk/session", json=SESSION_REQUEST)
         sid = session_response.json()["sid"]
 
         # Settle payment
-        xps = "w3c.v1;tp=00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
         response = client.post(
             "/x402/settle",
             json=sample_payment_data,
             headers={
                 "X-PAYMENT": "base64encodedpayment",
-                "X-PAYMENT-SECURE": xps,
+                "X-PAYMENT-SECURE": XPS,
                 "X-RISK-SESSION": sid,
                 "Origin": "https://test.example.com",
             },
@@ -153,16 +145,12 @@ class TestCompletePaymentFlow:
         assert data["network"] == "base-sepolia"
 
 
-@pytest.mark.asyncio
 class TestRiskEvaluation:
     """Test risk evaluation logic."""
 
     @pytest.fixture
     def app(self):
         """Create FastAPI app instance."""
-        from fastapi import FastAPI
-        from x402_proxy import risk_router, router
-
         app = FastAPI(title="Test x402 Proxy")
         app.include_router(risk_router)
         app.include_router(router)
@@ -173,13 +161,10 @@ class TestRiskEvaluation:
         """Create test client."""
         return TestClient(app)
 
-    async def test_risk_evaluation_allow(self, client: TestClient):
+    def test_risk_evaluation_allow(self, client: TestClient):
         """Test risk evaluation with allow decision."""
         # Create session
-        session_response = client.post(
-            "/risk/session",
-            json={"agent_did": "0x" + "b" * 40, "wallet_address": "0x" + "b" * 40},
-        )
+        session_response = client.post("/risk/session", json=SESSION_REQUEST)
         sid = session_response.json()["sid"]
 
         # Submit trace
@@ -194,7 +179,7 @@ class TestRiskEvaluation:
             json={
                 "sid": sid,
                 "tid": tid,
-                "trace_context": {"tp": "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"},
+                "trace_context": {"tp": TRACEPARENT},
                 "payment": {
                     "protocol": "eip3009",
                     "network": "base-sepolia",
@@ -217,9 +202,7 @@ class TestRiskEvaluation:
 
     @pytest.mark.skip(reason="Requires complex async mocking of external risk engine")
     @patch("httpx.AsyncClient")
-    async def test_risk_evaluation_external(
-        self, mock_httpx: AsyncMock, client: TestClient, monkeypatch
-    ):
+    def test_risk_evaluation_external(self, mock_httpx: AsyncMock, client: TestClient, monkeypatch):
         """Test risk evaluation with external Trustline engine."""
         # Switch to external risk mode
         monkeypatch.setenv("PROXY_LOCAL_RISK", "0")
@@ -242,7 +225,7 @@ class TestRiskEvaluation:
             "/risk/evaluate",
             json={
                 "sid": "925ca6ee-aa4b-4508-955b-10b1c02c69bb",
-                "trace_context": {"tp": "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"},
+                "trace_context": {"tp": TRACEPARENT},
                 "payment": {
                     "protocol": "x402:exact",
                     "network": "base-sepolia",